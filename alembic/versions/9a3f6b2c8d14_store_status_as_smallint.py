@@ -0,0 +1,58 @@
+"""Store status as smallint
+
+Revision ID: 9a3f6b2c8d14
+Revises: 4c2d9e7a1f03
+Create Date: 2026-10-15 10:02:17.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3f6b2c8d14'
+down_revision: Union[str, None] = '4c2d9e7a1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+job_status = sa.Enum(
+    'PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', name='job_status')
+
+
+def upgrade() -> None:
+    # Codes must match app.models.STATUS_CODES
+    op.alter_column(
+        'job', 'status',
+        existing_type=job_status,
+        type_=sa.SmallInteger(),
+        existing_nullable=False,
+        postgresql_using=(
+            "CASE status "
+            "WHEN 'PENDING' THEN 0 "
+            "WHEN 'PROCESSING' THEN 1 "
+            "WHEN 'COMPLETED' THEN 2 "
+            "WHEN 'FAILED' THEN 3 "
+            "END"
+        ),
+    )
+    job_status.drop(op.get_bind(), checkfirst=True)
+
+
+def downgrade() -> None:
+    job_status.create(op.get_bind(), checkfirst=True)
+    op.alter_column(
+        'job', 'status',
+        existing_type=sa.SmallInteger(),
+        type_=job_status,
+        existing_nullable=False,
+        postgresql_using=(
+            "(CASE status "
+            "WHEN 0 THEN 'PENDING' "
+            "WHEN 1 THEN 'PROCESSING' "
+            "WHEN 2 THEN 'COMPLETED' "
+            "WHEN 3 THEN 'FAILED' "
+            "END)::job_status"
+        ),
+    )
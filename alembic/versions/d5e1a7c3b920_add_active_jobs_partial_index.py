@@ -0,0 +1,35 @@
+"""Add active jobs partial index
+
+Revision ID: d5e1a7c3b920
+Revises: 9a3f6b2c8d14
+Create Date: 2026-10-15 10:41:05.226718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e1a7c3b920'
+down_revision: Union[str, None] = '9a3f6b2c8d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Status codes 0, 1 = PENDING, PROCESSING (see app.models.STATUS_CODES)
+    op.create_index(
+        'ix_job_active', 'job', ['priority', 'scheduled_at'], unique=False,
+        postgresql_where=sa.text('status IN (0, 1)'),
+        sqlite_where=sa.text('status IN (0, 1)'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_job_active', table_name='job',
+        postgresql_where=sa.text('status IN (0, 1)'),
+        sqlite_where=sa.text('status IN (0, 1)'),
+    )
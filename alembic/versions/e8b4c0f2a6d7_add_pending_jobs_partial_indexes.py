@@ -0,0 +1,54 @@
+"""Add pending jobs partial indexes, drop active jobs index
+
+Revision ID: e8b4c0f2a6d7
+Revises: d5e1a7c3b920
+Create Date: 2026-10-15 11:37:52.604119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4c0f2a6d7'
+down_revision: Union[str, None] = 'd5e1a7c3b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Status codes 0, 1 = PENDING, PROCESSING (see app.models.STATUS_CODES)
+PENDING = sa.text('status IN (0)')
+SCHEDULED_PENDING = sa.text('status IN (0) AND scheduled_at IS NOT NULL')
+ACTIVE = sa.text('status IN (0, 1)')
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_job_pending_priority', 'job', ['priority', 'created_at'],
+        unique=False,
+        postgresql_where=PENDING,
+        sqlite_where=PENDING,
+    )
+    op.create_index(
+        'ix_job_pending_scheduled', 'job', ['scheduled_at'],
+        unique=False,
+        postgresql_where=SCHEDULED_PENDING,
+        sqlite_where=SCHEDULED_PENDING,
+    )
+    # Superseded by the two above; the gauges use ix_job_status_id
+    op.drop_index(
+        'ix_job_active', table_name='job',
+        postgresql_where=ACTIVE,
+        sqlite_where=ACTIVE,
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_job_active', 'job', ['priority', 'scheduled_at'], unique=False,
+        postgresql_where=ACTIVE,
+        sqlite_where=ACTIVE,
+    )
+    op.drop_index('ix_job_pending_scheduled', table_name='job')
+    op.drop_index('ix_job_pending_priority', table_name='job')
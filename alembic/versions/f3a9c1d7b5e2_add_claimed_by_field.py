@@ -0,0 +1,26 @@
+"""Add claimed by field
+
+Revision ID: f3a9c1d7b5e2
+Revises: e8b4c0f2a6d7
+Create Date: 2026-10-15 14:22:08.915307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c1d7b5e2'
+down_revision: Union[str, None] = 'e8b4c0f2a6d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('job', sa.Column('claimed_by', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('job', 'claimed_by')
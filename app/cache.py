@@ -0,0 +1,23 @@
+"""
+In-process caches for hot API reads
+"""
+from cachetools import TLRUCache
+
+from app.schemas import JobResponse, JobStatus
+
+# Jobs in these states are never updated again
+TERMINAL_STATUSES = frozenset({JobStatus.COMPLETED, JobStatus.FAILED})
+
+ACTIVE_JOB_TTL_SECONDS = 0.5
+TERMINAL_JOB_TTL_SECONDS = 60.0
+
+
+def _job_ttu(_job_id: int, response: JobResponse, now: float) -> float:
+    """Expiry time for a cached job - longer once it can no longer change"""
+    if response.status in TERMINAL_STATUSES:
+        return now + TERMINAL_JOB_TTL_SECONDS
+    return now + ACTIVE_JOB_TTL_SECONDS
+
+
+# job_id -> JobResponse, for clients polling GET /jobs/{job_id}
+job_cache = TLRUCache(maxsize=10_000, ttu=_job_ttu)
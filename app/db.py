@@ -2,24 +2,129 @@
 Docstring for app.db
 """
 import os
+from uuid import uuid4
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SESSIONLOCAL = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async drivers used by the API for each supported backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> URL:
+    """Swap the driver in a database URL for its async equivalent"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()])
+
+
+# API connection pool. A single async process can have hundreds of queries
+# in flight, so size the pool well above the sync default of 5 + 10 and
+# fail fast rather than queue for long when it is exhausted.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "80"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "2"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+# Set when the API connects through pgbouncer in transaction pooling mode,
+# which already pools server connections - a second pool here only gets in
+# the way. Only the API's async engine reads it: point workers at Postgres
+# directly, as their LISTEN for new jobs needs a session of its own, which
+# transaction pooling doesn't give them.
+DB_USE_PGBOUNCER = os.getenv("DB_USE_PGBOUNCER", "false").lower() == "true"
+
+
+def _asyncpg_statement_name() -> str:
+    """A prepared statement name no other client of pgbouncer will use"""
+    return f"__asyncpg_{uuid4()}__"
+
+
+def async_pool_options(url: URL) -> dict:
+    """Connection pool arguments for the API's async engine"""
+    if DB_USE_PGBOUNCER:
+        if url.get_backend_name() != "postgresql":
+            return {"poolclass": NullPool}
+        # Each transaction may land on a different server connection, so
+        # asyncpg mustn't cache prepared statements or reuse their names
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _asyncpg_statement_name,
+            },
+        }
+    if url.get_backend_name() == "sqlite":
+        # SQLite picks its own pool; sizing options don't apply
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+# Worker connection pool. Only a worker's main thread uses the database -
+# job threads never do - so a worker process holds at most two connections
+# however high WORKER_CONCURRENCY is: its session and its LISTEN connection.
+# Size for that, and remember Postgres sees WORKER_PROCESSES times as many.
+WORKER_DB_POOL_SIZE = int(os.getenv("WORKER_DB_POOL_SIZE", "2"))
+WORKER_DB_MAX_OVERFLOW = int(os.getenv("WORKER_DB_MAX_OVERFLOW", "2"))
+
+
+def sync_pool_options(url: URL) -> dict:
+    """
+    Connection pool arguments for the sync engine. Workers connect to
+    Postgres directly, so DB_USE_PGBOUNCER doesn't apply here.
+    """
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": WORKER_DB_POOL_SIZE,
+        "max_overflow": WORKER_DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # A worker can idle for long stretches - check connections are
+        # still alive before use rather than fail the next claim
+        "pool_pre_ping": True,
+        # Reuse the most recent connection so spare ones can time out
+        "pool_use_lifo": True,
+    }
+
+
+# Sync engine - used by the worker and Alembic
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    **sync_pool_options(make_url(SQLALCHEMY_DATABASE_URL)))
+# Jobs claimed by the worker are read after the claim is committed, so
+# don't expire them on commit (that would reload each row)
+SESSIONLOCAL = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async engine - used by the API so DB I/O doesn't tie up a thread
+ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **async_pool_options(ASYNC_DATABASE_URL))
+ASYNC_SESSIONLOCAL = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+# Postgres NOTIFY channel the API signals when a job is created, so idle
+# workers wake up straight away instead of waiting for their next poll
+JOB_CREATED_CHANNEL = "job_created"
+
 
-def get_db():
+async def get_db():
     """Get DB"""
-    db = SESSIONLOCAL()
-    try:
+    async with ASYNC_SESSIONLOCAL() as db:
         yield db
-    finally:
-        db.close()
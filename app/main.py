@@ -2,32 +2,58 @@
 from typing import Optional
 import datetime
 
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import Response
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, func, lambda_stmt, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from prometheus_client import CONTENT_TYPE_LATEST
+from app.schemas import (
+    JobCreateRequest, JobResponse, JobStatus, JobListResponse, JobBatchResponse
+)
+from app.db import get_db, JOB_CREATED_CHANNEL
+from app.models import Job
+from app.utils import build_job_response, json_response, stream_job_list
+from app.cache import job_cache
+from app.metrics import jobs_created_counter, for_job_type, render_latest
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+app = FastAPI(default_response_class=ORJSONResponse)
 
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from app.schemas import JobCreateRequest, JobResponse, JobStatus, JobListResponse
-from app.db import get_db
-from app.models import Job
-from app.utils import build_job_response
-from app.metrics import jobs_created_counter
+# Maximum number of ids accepted by GET /jobs/batch
+MAX_BATCH_IDS = 500
+
+# Rows fetched from the database per round trip when streaming GET /jobs
+JOB_LIST_YIELD_PER = 100
 
-app = FastAPI()
+# Hot lookups, built once so per-request calls skip statement construction
+# and compile-cache key generation. Values are passed as bind parameters.
+_JOB_BY_IDEMPOTENCY_KEY = lambda_stmt(
+    lambda: select(Job).where(
+        Job.idempotency_key == bindparam("idempotency_key"))
+)
+_JOB_BY_ID = lambda_stmt(
+    lambda: select(Job).where(Job.id == bindparam("job_id"))
+)
+
+# Dialect-specific INSERT constructs that support ON CONFLICT ... RETURNING
+_INSERT_BY_DIALECT = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
 
 
 @app.get("/health")
-def health():
+async def health():
     """Health check endpoint to verify service is running"""
     return {"status": "ok"}
 
 
 @app.post("/jobs", response_model=JobResponse)
-def create_job(
+async def create_job(
         job_request: JobCreateRequest,
-        db: Session = Depends(get_db)):
+        db: AsyncSession = Depends(get_db)):
     """
     Create a new job with idempotency support.
 
@@ -38,138 +64,206 @@ def create_job(
     duplicate jobs.
     """
 
-    # Check if job with this idempotency key exists
-    existing_job = db.query(Job).filter(
-        Job.idempotency_key == job_request.idempotency_key
-    ).first()
-
-    if existing_job:
-        # Return existing job
-        return build_job_response(existing_job)
-
-    # Otherwise, create a new job
-    current_time = datetime.datetime.now()
-
-    # Parse scheduled_at if provided
-    scheduled_at_datetime = None
-    if job_request.scheduled_at:
-        try:
-            # Parse ISO format datetime string
-            scheduled_at_datetime = datetime.datetime.fromisoformat(
-                job_request.scheduled_at.replace('Z', '+00:00')
-            )
-        except (ValueError, AttributeError) as exc:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "Invalid scheduled_at format. "
-                    "Use ISO 8601 format (e.g., 2026-01-30T15:00:00)"
-                )
-            ) from exc
-
-    new_job = Job(
+    current_time = datetime.datetime.now(datetime.timezone.utc)
+
+    # Insert unless the idempotency key is taken, in a single statement.
+    # This also closes the race where two concurrent requests with the
+    # same key both miss a SELECT and both try to INSERT.
+    dialect_name = db.get_bind().dialect.name
+    insert = _INSERT_BY_DIALECT[dialect_name]
+    stmt = insert(Job).values(
         idempotency_key=job_request.idempotency_key,
         type=job_request.type,
         payload=job_request.payload,
         status=JobStatus.PENDING,
         priority=job_request.priority,
-        scheduled_at=scheduled_at_datetime,
+        scheduled_at=job_request.scheduled_at,
         attempts=0,
         max_attempts=3,
         created_at=current_time,
         updated_at=current_time
-    )
+    ).on_conflict_do_nothing(
+        index_elements=["idempotency_key"]
+    ).returning(Job)
 
-    db.add(new_job)
-    db.commit()
-    db.refresh(new_job)  # Gets a new auto-generated ID
+    new_job = (await db.execute(stmt)).scalar_one_or_none()
+
+    if new_job is not None and dialect_name == "postgresql":
+        # Wake idle workers; delivered only once this transaction commits
+        await db.execute(text(f"NOTIFY {JOB_CREATED_CHANNEL}"))
+
+    await db.commit()
+
+    if new_job is None:
+        # Key already exists - return the original job
+        existing_job = (await db.execute(
+            _JOB_BY_IDEMPOTENCY_KEY,
+            {"idempotency_key": job_request.idempotency_key}
+        )).scalar_one()
+        return json_response(build_job_response(existing_job))
 
     # Record metrics
-    jobs_created_counter.labels(job_type=new_job.type).inc()
+    for_job_type(jobs_created_counter, new_job.type).inc()
+
+    response = build_job_response(new_job)
+    job_cache[new_job.id] = response
+
+    return json_response(response)
 
-    return build_job_response(new_job)
+
+@app.get("/jobs/batch", response_model=JobBatchResponse)
+async def get_jobs_batch(
+        ids: str = Query(..., description="Comma-separated job ids"),
+        db: AsyncSession = Depends(get_db)):
+    """
+    Get several jobs by ID in one request.
+
+    Returns a map of job_id -> job. Ids that don't exist are left out.
+    Cached jobs are served from memory and the rest are fetched with a
+    single query.
+    """
+    try:
+        job_ids = {int(part) for part in ids.split(",") if part.strip()}
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail="ids must be a comma-separated list of integers"
+        ) from exc
+
+    if len(job_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_IDS} ids can be requested at once"
+        )
+
+    found = {}
+    missing = []
+    for job_id in job_ids:
+        cached = job_cache.get(job_id)
+        if cached is not None:
+            found[job_id] = cached
+        else:
+            missing.append(job_id)
+
+    if missing:
+        jobs = await db.scalars(select(Job).where(Job.id.in_(missing)))
+        for job in jobs:
+            response = build_job_response(job)
+            job_cache[job.id] = response
+            found[job.id] = response
+
+    return json_response(JobBatchResponse(jobs=found))
 
 
 @app.get("/jobs/{job_id}", response_model=JobResponse)
-def get_job(job_id: int, db: Session = Depends(get_db)):
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get the status and details of a specific job by ID.
+
+    Responses are cached briefly (longer once the job has finished) so
+    clients polling the same job don't hit the database every time.
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
+    cached = job_cache.get(job_id)
+    if cached is not None:
+        return json_response(cached)
+
+    job = (await db.execute(
+        _JOB_BY_ID, {"job_id": job_id})).scalar_one_or_none()
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return build_job_response(job)
+    response = build_job_response(job)
+    job_cache[job_id] = response
+
+    return json_response(response)
 
 
 @app.get("/jobs", response_model=JobListResponse)
 # Status is an optional query parameter as opposed to a URL parameter
-def get_jobs(
+async def get_jobs(
         status: Optional[JobStatus] = None,
-        db: Session = Depends(get_db)):
+        limit: int = Query(50, ge=1, le=500),
+        after_id: Optional[int] = None,
+        db: AsyncSession = Depends(get_db)):
     """
-    List all jobs, optionally filtered by status.
+    List jobs one page at a time, optionally filtered by status.
+
+    Uses keyset pagination on the job id so each page is an index range
+    scan over (status, id) rather than a scan of the whole table. Rows
+    are streamed to the client as they are fetched instead of being
+    collected into one response first.
 
     Query parameters:
     - status: Filter jobs by status (PENDING, PROCESSING, COMPLETED, FAILED)
+    - limit: Maximum number of jobs to return (1-500, default 50)
+    - after_id: Cursor; only return jobs with an id greater than this
     """
-    query = db.query(Job)
+    query = select(Job)
 
     if status is not None:
-        query = query.filter(Job.status == status)
+        query = query.where(Job.status == status)
 
-    jobs = query.all()
+    if after_id is not None:
+        query = query.where(Job.id > after_id)
 
-    # Conver to response format
-    job_list = [build_job_response(job) for job in jobs]
+    # One row past the page tells whether another page follows
+    query = query.order_by(Job.id).limit(limit + 1).execution_options(
+        yield_per=JOB_LIST_YIELD_PER)
+    jobs = await db.stream_scalars(query)
 
-    return JobListResponse(jobs=job_list)
+    return StreamingResponse(
+        stream_job_list(jobs, limit),
+        media_type="application/json"
+    )
 
 
 @app.get("/metrics")
-def metrics():
+async def metrics():
     """
     Prometheus Metrics Endpoint
     """
     return Response(
-        content=generate_latest(),
+        content=render_latest(),
         media_type=CONTENT_TYPE_LATEST
     )
 
 
 @app.get("/admin/stats")
-def get_stats(db: Session = Depends(get_db)):
+async def get_stats(db: AsyncSession = Depends(get_db)):
     """Admin endpoint showing system statistics"""
 
-    # Get counts by status
-    status_counts = db.query(
+    # Counts and attempt totals per (status, type) in one round trip
+    grouped_counts = (await db.execute(select(
         Job.status,
-        func.count(Job.id).label('count')  # pylint: disable=not-callable
-    ).group_by(Job.status).all()
-
-    # Get counts by type
-    type_counts = db.query(
         Job.type,
-        func.count(Job.id).label('count')  # pylint: disable=not-callable
-    ).group_by(Job.type).all()
-
-    # Get average attempts for failed jobs
-    avg_attempts = db.query(
-        func.avg(Job.attempts)
-    ).filter(Job.status == JobStatus.FAILED).scalar()
+        func.count(Job.id).label('count'),  # pylint: disable=not-callable
+        func.sum(Job.attempts).label('attempts')
+    ).group_by(Job.status, Job.type))).all()
+
+    status_breakdown = {}
+    type_breakdown = {}
+    failed_count = 0
+    failed_attempts = 0
+    for status, job_type, count, attempts in grouped_counts:
+        status_breakdown[status.value] = \
+            status_breakdown.get(status.value, 0) + count
+        type_breakdown[job_type] = type_breakdown.get(job_type, 0) + count
+        if status == JobStatus.FAILED:
+            failed_count += count
+            failed_attempts += attempts or 0
+
+    avg_attempts = failed_attempts / failed_count if failed_count else 0
 
     # Recent failed jobs
-    recent_failures = db.query(Job).filter(
+    recent_failures = (await db.scalars(select(Job).where(
         Job.status == JobStatus.FAILED
-    ).order_by(Job.updated_at.desc()).limit(10).all()
+    ).order_by(Job.updated_at.desc()).limit(10))).all()
 
     return {
-        "status_breakdown": {
-            status.value: count for status, count in status_counts
-        },
-        "type_breakdown": dict(type_counts),
-        "avg_attempts_for_failed_jobs": float(avg_attempts) if avg_attempts else 0,
+        "status_breakdown": status_breakdown,
+        "type_breakdown": type_breakdown,
+        "avg_attempts_for_failed_jobs": float(avg_attempts),
         "recent_failures": [
             {
                 "job_id": job.id,
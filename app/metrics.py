@@ -1,7 +1,9 @@
 '''
 Prometheus metrics configuration
 '''
-from prometheus_client import Counter, Histogram, Gauge
+import time
+
+from prometheus_client import Counter, Histogram, Gauge, generate_latest
 
 # Counters - always increase
 jobs_created_counter = Counter(
@@ -57,3 +59,42 @@ worker_up_gauge = Gauge(
     'worker_up',
     'Worker health status (1 = up, 0 = down)'
 )
+
+
+# Label children bound per (metric, job_type). Calling .labels() on every
+# event re-resolves the label values under the metric's lock; binding
+# each child once turns the hot path into a single dict lookup.
+_job_type_children = {}
+
+
+def for_job_type(metric, job_type: str):
+    """Return the child of a job_type-labelled metric, binding it once"""
+    try:
+        return _job_type_children[metric, job_type]
+    except KeyError:
+        child = metric.labels(job_type=job_type)
+        _job_type_children[metric, job_type] = child
+        return child
+
+
+def bind_job_types(metrics, job_types):
+    """Bind the children for known job types up front, so the hot path
+    never takes the .labels() miss and the series export from zero"""
+    for metric in metrics:
+        for job_type in job_types:
+            for_job_type(metric, job_type)
+
+
+# Rendered exposition text is reused for scrapes within this window, so
+# frequent scrapes don't re-walk every collector each time.
+METRICS_CACHE_TTL_SECONDS = 0.25
+_latest = {"rendered_at": float("-inf"), "body": b""}
+
+
+def render_latest() -> bytes:
+    """generate_latest(), cached for METRICS_CACHE_TTL_SECONDS"""
+    now = time.monotonic()
+    if now - _latest["rendered_at"] >= METRICS_CACHE_TTL_SECONDS:
+        _latest["body"] = generate_latest()
+        _latest["rendered_at"] = now
+    return _latest["body"]
@@ -3,16 +3,82 @@ SQLAlchemy Table Models
 """
 from typing import Optional, Dict
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, Enum, JSON, func
+from sqlalchemy import (
+    String, Integer, SmallInteger, DateTime, JSON, Index, TypeDecorator, func,
+    and_, text
+)
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from app.db import Base
 from app.schemas import JobStatus
 
 
+# On-disk codes for JobStatus. Codes are stored in the database, so
+# never renumber an existing status - only append new ones.
+STATUS_CODES = {
+    JobStatus.PENDING: 0,
+    JobStatus.PROCESSING: 1,
+    JobStatus.COMPLETED: 2,
+    JobStatus.FAILED: 3,
+}
+STATUSES_BY_CODE = {code: status for status, code in STATUS_CODES.items()}
+
+
+class StatusCode(TypeDecorator):  # pylint: disable=too-many-ancestors
+    """Stores a JobStatus as a SMALLINT code instead of a native ENUM"""
+    impl = SmallInteger
+    cache_ok = True
+
+    # JobStatus members hash and compare like their string values, so
+    # members and plain strings both look up directly - no JobStatus()
+    # coercion on every bind
+    def process_bind_param(self, value, dialect):
+        return None if value is None else STATUS_CODES[value]
+
+    def process_literal_param(self, value, dialect):
+        return "NULL" if value is None else str(STATUS_CODES[value])
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else STATUSES_BY_CODE[value]
+
+    @property
+    def python_type(self):
+        return JobStatus
+
+
+def status_in(*statuses: JobStatus):
+    """Raw SQL predicate on stored status codes, for partial index clauses"""
+    codes = ", ".join(str(STATUS_CODES[status]) for status in statuses)
+    return text(f"status IN ({codes})")
+
+
+PENDING_STATUS_PREDICATE = status_in(JobStatus.PENDING)
+SCHEDULED_PENDING_PREDICATE = and_(
+    PENDING_STATUS_PREDICATE, text("scheduled_at IS NOT NULL"))
+
+
 class Job(Base): # pylint: disable=too-few-public-methods
     """Job"""
     __tablename__ = "job"
+    __table_args__ = (
+        # Backs keyset pagination on GET /jobs (optionally by status)
+        Index("ix_job_status_id", "status", "id"),
+        # Worker polling only looks at pending jobs. Finished jobs dominate
+        # the table over time, so they are left out to keep these small.
+        # Matches the dequeue ORDER BY, so the next job is the first
+        # entry of an index range scan - no sort over pending rows
+        Index(
+            "ix_job_pending_priority", "priority", "created_at",
+            postgresql_where=PENDING_STATUS_PREDICATE,
+            sqlite_where=PENDING_STATUS_PREDICATE,
+        ),
+        # Finds scheduled jobs that have come due
+        Index(
+            "ix_job_pending_scheduled", "scheduled_at",
+            postgresql_where=SCHEDULED_PENDING_PREDICATE,
+            sqlite_where=SCHEDULED_PENDING_PREDICATE,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer,
@@ -33,7 +99,7 @@ class Job(Base): # pylint: disable=too-few-public-methods
     )
 
     status: Mapped[JobStatus] = mapped_column(
-        Enum(JobStatus, name="job_status"),
+        StatusCode(),
         nullable=False,
         default=JobStatus.PENDING,
     )
@@ -99,3 +165,10 @@ class Job(Base): # pylint: disable=too-few-public-methods
         DateTime(timezone=True),
         nullable=True,
     )
+
+    # Worker process ("host:pid") holding the job while it is PROCESSING,
+    # so a supervisor can release the jobs of a worker that died
+    claimed_by: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True,
+    )
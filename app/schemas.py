@@ -2,8 +2,10 @@
 Pydantic Models
 """
 from typing import Any, Optional, Dict, List
+from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, AliasChoices, ConfigDict, Field
+
 
 class JobStatus(str, Enum):
     """Job Status Model"""
@@ -13,33 +15,62 @@ class JobStatus(str, Enum):
     FAILED = "FAILED"
 
 
-class JobCreateRequest(BaseModel):
+class APIModel(BaseModel):
+    """
+    Base for API schemas.
+
+    Builds validators at import time, never re-validates model instances
+    passed into other models, and ignores unknown fields, so work stays
+    on pydantic-core's compiled fast path.
+    """
+    model_config = ConfigDict(
+        defer_build=False,
+        revalidate_instances="never",
+        extra="ignore",
+    )
+
+
+class JobCreateRequest(APIModel):
     """Job Create Request Model"""
     type: str
     idempotency_key: str
     payload: Dict[str, Any]
     priority: Optional[int] = 5
-    scheduled_at: Optional[str] = None
+    # Parsed from ISO 8601 (a trailing 'Z' is accepted) during validation
+    scheduled_at: Optional[datetime] = None
 
 
-class JobResponse(BaseModel):
-    """Job Response Model"""
-    job_id: int
+class JobResponse(APIModel):
+    """
+    Job Response Model - built straight from a Job row.
+
+    Timestamps stay datetimes; the JSON encoders render them as ISO 8601.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    # Job rows call this column `id`
+    job_id: int = Field(validation_alias=AliasChoices("job_id", "id"))
     type: str
     idempotency_key: str
     status: JobStatus
     priority: int
     payload: Dict[str, Any]
-    created_at: str
-    updated_at: str
-    started_at: Optional[str]
-    finished_at: Optional[str]
-    scheduled_at: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    scheduled_at: Optional[datetime]
     error_message: Optional[str]
     attempts: int
     result: Optional[Any] = None
 
 
-class JobListResponse(BaseModel):
+class JobBatchResponse(APIModel):
+    """Job Batch Response Model"""
+    jobs: Dict[int, JobResponse]
+
+
+class JobListResponse(APIModel):
     """Job List Response Model"""
     jobs: List[JobResponse]
+    next_cursor: Optional[int] = None
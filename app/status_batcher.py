@@ -0,0 +1,49 @@
+"""
+Coalesces job status writes into batched UPDATE statements
+"""
+import threading
+from typing import Any, Dict
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import Job
+
+
+class StatusBatcher:
+    """
+    Buffers per-job column updates and writes them in one round trip.
+
+    The worker fills one batcher per claimed batch and flushes it once,
+    so a batch of finished jobs costs one UPDATE + COMMIT instead of one
+    per job. Safe to put() from several threads.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._pending
+
+    def put(self, job_id: int, **values: Any):
+        """Queue column updates for a job, merging with any already queued"""
+        with self._lock:
+            self._pending.setdefault(job_id, {"id": job_id}).update(values)
+
+    def flush(self, db: Session) -> int:
+        """Write all queued updates and commit. Returns the number of jobs"""
+        with self._lock:
+            if not self._pending:
+                return 0
+
+            rows = list(self._pending.values())
+            self._pending = {}
+
+        # ORM bulk UPDATE by primary key - one executemany per column set
+        db.execute(update(Job), rows)
+        db.commit()
+        return len(rows)
@@ -1,6 +1,12 @@
 """
 Utility functions for processing and formatting job data
 """
+from typing import AsyncIterable, AsyncIterator
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
 from app.schemas import JobResponse
 from app.models import Job
 
@@ -15,19 +21,89 @@ def build_job_response(job: Job) -> JobResponse:
     Returns:
         JobResponse: Pydantic model for API response
     """
-    return JobResponse(
-        job_id=job.id,
-        idempotency_key=job.idempotency_key,
-        type=job.type,
-        status=job.status,
-        priority=job.priority,
-        payload=job.payload,
-        created_at=job.created_at.isoformat(),
-        updated_at=job.updated_at.isoformat(),
-        started_at=job.started_at.isoformat() if job.started_at else None,
-        finished_at=job.finished_at.isoformat() if job.finished_at else None,
-        scheduled_at=job.scheduled_at.isoformat() if job.scheduled_at else None,
-        error_message=job.error_message,
-        attempts=job.attempts,
-        result=job.result,
+    return JobResponse.model_validate(job)
+
+
+# JobResponse fields whose Job attribute has a different name
+_JOB_ATTRIBUTES = {"job_id": "id"}
+
+
+def _compile_job_packer():
+    """
+    Generate pack_job() from JobResponse's fields.
+
+    The list endpoint always emits the same shape, so instead of running
+    each row through pydantic this builds one function that reads each
+    attribute directly and makes a single orjson call per row. The field
+    list comes from the schema, so the two cannot drift apart.
+    """
+    items = ", ".join(
+        f"{name!r}: job.{_JOB_ATTRIBUTES.get(name, name)}"
+        for name in JobResponse.model_fields
+    )
+    source = (
+        "def pack_job(job):\n"
+        f"    return dumps({{{items}}}, option=option)\n"
     )
+    namespace = {
+        "dumps": orjson.dumps,  # pylint: disable=no-member
+        "option": orjson.OPT_UTC_Z,  # pylint: disable=no-member
+    }
+    exec(compile(source, "<pack_job>", "exec"), namespace)  # pylint: disable=exec-used
+    return namespace["pack_job"]
+
+
+# pack_job(job) -> bytes: one Job encoded exactly like JobResponse
+pack_job = _compile_job_packer()
+
+
+def json_response(model: BaseModel) -> ORJSONResponse:
+    """
+    Wrap a response model so a route can return it directly.
+
+    Returning a Response skips FastAPI's second validation against the
+    route's response_model and its jsonable_encoder pass: the model is
+    dumped once by pydantic-core and encoded by orjson.
+
+    Args:
+        model: Pydantic model to send
+
+    Returns:
+        ORJSONResponse: JSON response for the model
+    """
+    return ORJSONResponse(model.model_dump(mode="json"))
+
+
+async def stream_job_list(
+        jobs: AsyncIterable[Job], limit: int) -> AsyncIterator[bytes]:
+    """
+    Encode a page of jobs as a JobListResponse JSON document, one job at
+    a time, so the body is sent while rows are still being fetched.
+
+    Args:
+        jobs: Jobs for the page in id order, plus the first job of the
+            next page if there is one
+        limit: Page size requested
+
+    Yields:
+        bytes: Chunks of the JSON response body
+    """
+    yield b'{"jobs":['
+
+    count = 0
+    last_id = None
+    next_cursor = None
+    async for job in jobs:
+        if count == limit:
+            # A row past the page - the next page starts after last_id
+            next_cursor = last_id
+            break
+        if count:
+            yield b","
+        yield pack_job(job)
+        count += 1
+        last_id = job.id
+
+    yield (b'],"next_cursor":'
+           + orjson.dumps(next_cursor)  # pylint: disable=no-member
+           + b"}")
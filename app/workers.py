@@ -3,18 +3,27 @@ import time
 import datetime
 import random
 import logging
+import multiprocessing
 import os
+import select as io_select
+import socket
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures import wait as wait_all
+from multiprocessing.connection import wait as wait_any
+from typing import Callable, List, NamedTuple, Optional, Union
 from dotenv import load_dotenv
 
 from prometheus_client import start_http_server
 
-from sqlalchemy.orm import Session
-from sqlalchemy import asc, or_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, scoped_session
+from sqlalchemy import asc, bindparam, func, lambda_stmt, or_, select, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.db import SESSIONLOCAL
+from app.db import SESSIONLOCAL, JOB_CREATED_CHANNEL, engine
 from app.models import Job
 from app.schemas import JobStatus
+from app.status_batcher import StatusBatcher
 from app.metrics import (
     jobs_completed_counter,
     jobs_failed_counter,
@@ -23,11 +32,32 @@ from app.metrics import (
     job_queue_wait_histogram,
     jobs_pending_gauge,
     jobs_processing_gauge,
-    worker_up_gauge
+    worker_up_gauge,
+    bind_job_types,
+    for_job_type
 )
 
 load_dotenv()
+# Worker processes to run. Each serves metrics on its own port, counting
+# up from WORKER_METRICS_PORT.
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
 WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "8001"))
+# Pause before replacing a worker process that died, so one that crashes
+# on startup (database down, port taken) doesn't restart in a hot loop.
+WORKER_RESTART_DELAY = float(os.getenv("WORKER_RESTART_DELAY", "1"))
+# Jobs claimed per round trip. Larger batches amortise the claim and
+# status-write statements over more jobs.
+WORKER_BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "16"))
+# Jobs from a batch run at the same time, on this many threads. Handlers
+# spend their time waiting on I/O, which releases the GIL, so they overlap.
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "16"))
+# Simulated handler I/O time. Tests set this to 0.
+HANDLER_SIMULATED_LATENCY = float(
+    os.getenv("HANDLER_SIMULATED_LATENCY_MS", "2000")) / 1000
+# Longest an idle worker waits before polling again. New jobs wake it
+# sooner via NOTIFY, and it wakes for the next scheduled job as it comes
+# due, so this is only a safety net where NOTIFY isn't available.
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1"))
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,6 +65,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Session per thread - each worker process gets its own via _init_worker
+WORKER_SESSION = scoped_session(SESSIONLOCAL)
+
+# Simulated failures draw from this process's own generator rather than
+# the shared global one. Reseeded in each worker process.
+_rng = random.Random(os.getpid())
+
 
 # Custom exceptions for better error handling
 class JobExecutionError(Exception):
@@ -45,16 +82,21 @@ class UnknownJobTypeError(ValueError):
     """Raised when job type is not recognized."""
 
 
-def execute_job(job: Job):
-    """Route job to appropriate handler based on type"""
+class ClaimedJob(NamedTuple):
+    """The columns of a claimed job that the worker needs to run it"""
+    id: int
+    type: str
+    payload: dict
+    priority: int
+    attempts: int
+    max_attempts: int
+    created_at: datetime.datetime
+    scheduled_at: Optional[datetime.datetime]
 
-    handlers = {
-        "send_email": handle_send_email,
-        "process_data": handle_process_data,
-        "test_failure": handle_always_fail
-    }
 
-    handler = handlers.get(job.type)
+def execute_job(job: Union[Job, ClaimedJob]):
+    """Route job to appropriate handler based on type"""
+    handler = _HANDLERS.get(job.type)
     if not handler:
         raise UnknownJobTypeError(f"Unknown job type: {job.type}")
 
@@ -64,8 +106,8 @@ def execute_job(job: Job):
 
 def handle_send_email(payload: dict):
     """Simulate sending an email"""
-    time.sleep(2)
-    if random.random() < 0.2:
+    time.sleep(HANDLER_SIMULATED_LATENCY)
+    if _rng.random() < 0.2:
         raise JobExecutionError("Email service temporarily unavailable")
 
     return {"sent_to": payload.get("to"), "status": "sent"}
@@ -73,8 +115,8 @@ def handle_send_email(payload: dict):
 
 def handle_process_data(payload: dict):
     """Simulate processing data"""
-    time.sleep(2)
-    if random.random() < 0.2:
+    time.sleep(HANDLER_SIMULATED_LATENCY)
+    if _rng.random() < 0.2:
         raise JobExecutionError("Process data service temporarily unavailable")
 
     return {"data": payload.get("data"), "status": "processed"}
@@ -82,137 +124,345 @@ def handle_process_data(payload: dict):
 
 def handle_always_fail(payload: dict):
     """Always fails - for testing retry logic"""
-    time.sleep(1)
+    time.sleep(HANDLER_SIMULATED_LATENCY / 2)
     raise JobExecutionError(
         f'This job is designed to fail. Payload: {payload}')
 
 
-def process_next_job(db: Session):
-    """Fetch and process a pending job from db"""
+_HANDLERS = {
+    "send_email": handle_send_email,
+    "process_data": handle_process_data,
+    "test_failure": handle_always_fail
+}
+
+bind_job_types(
+    (jobs_completed_counter, jobs_failed_counter, jobs_retried_counter,
+     job_duration_histogram, job_queue_wait_histogram),
+    _HANDLERS)
+
+
+# The claim runs on every poll, so build it once and let its compiled form
+# be reused. Values must be passed as bind parameters, never closed over.
+_CLAIM_BATCH = lambda_stmt(
+    lambda: update(Job)
+    .where(Job.id.in_(
+        select(Job.id).where(
+            Job.status == JobStatus.PENDING,
+            or_(
+                Job.scheduled_at.is_(None),        # Not scheduled - process now
+                Job.scheduled_at <= bindparam("now")  # Scheduled time arrived
+            )
+        ).order_by(
+            asc(Job.priority),
+            asc(Job.created_at)
+        ).limit(bindparam("batch_size")).with_for_update(skip_locked=True)
+    ))
+    .values(
+        status=JobStatus.PROCESSING,
+        claimed_by=bindparam("worker_id"),
+        started_at=bindparam("now"),
+        updated_at=bindparam("now"))
+    # Plain rows, not ORM objects - no identity map or change tracking.
+    # Same columns, in the same order, as ClaimedJob.
+    .returning(
+        Job.id, Job.type, Job.payload, Job.priority, Job.attempts,
+        Job.max_attempts, Job.created_at, Job.scheduled_at)
+)
+
 
+def worker_id(pid: Optional[int] = None) -> str:
+    """Name a worker process uniquely across hosts, as claimed_by records"""
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+
+def claim_batch(db: Session, batch_size: int) -> List[ClaimedJob]:
+    """
+    Claim up to `batch_size` ready jobs, highest priority first.
+
+    Selecting and marking the jobs PROCESSING is a single statement that
+    skips rows other workers have locked, so concurrent workers never
+    claim the same job. The caller commits the claim.
+    """
     current_time = datetime.datetime.now(datetime.timezone.utc)
 
-    job: Job = db.query(Job).filter(
+    rows = db.execute(
+        _CLAIM_BATCH,
+        {"now": current_time, "batch_size": batch_size,
+         "worker_id": worker_id()},
+        execution_options={"synchronize_session": False}
+    )
+
+    # RETURNING order isn't guaranteed - run in queue order
+    return sorted(
+        map(ClaimedJob._make, rows),
+        key=lambda job: (job.priority, job.created_at))
+
+
+# Served by the ix_job_pending_scheduled partial index
+_NEXT_SCHEDULED_AT = lambda_stmt(
+    lambda: select(func.min(Job.scheduled_at))  # pylint: disable=not-callable
+    .where(
         Job.status == JobStatus.PENDING,
-        or_(
-            Job.scheduled_at.is_(None),           # Not scheduled - process now
-            Job.scheduled_at <= current_time      # Scheduled time arrived
-        )
-    ).order_by(
-        asc(Job.priority),
-        asc(Job.created_at)
-    ).first()
-
-    if job:
-        # Calculate wait time for metrics
-        queue_wait_seconds = (current_time - job.created_at).total_seconds()
-        job_queue_wait_histogram.labels(
-            job_type=job.type).observe(queue_wait_seconds)
+        Job.scheduled_at > bindparam("now"))
+)
+
+
+def seconds_until_next_scheduled(db: Session, limit: float) -> float:
+    """Seconds until the next scheduled job comes due, capped at `limit`"""
+    current_time = datetime.datetime.now(datetime.timezone.utc)
+    next_scheduled_at = db.execute(
+        _NEXT_SCHEDULED_AT, {"now": current_time}).scalar()
+    db.commit()
+
+    if next_scheduled_at is None:
+        return limit
+    wait = (_as_utc(next_scheduled_at) - current_time).total_seconds()
+    return min(max(wait, 0.0), limit)
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    """Attach UTC to a naive timestamp (SQLite returns them without tzinfo)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def _finalize(
+        batcher: StatusBatcher,
+        job: ClaimedJob,
+        status: JobStatus,
+        now: datetime.datetime,
+        **values):
+    """Queue a job's new status, stamped with a single timestamp"""
+    if status in (JobStatus.COMPLETED, JobStatus.FAILED):
+        values["finished_at"] = now
+    batcher.put(job.id, status=status, updated_at=now, **values)
 
+
+def process_job(job: ClaimedJob, batcher: StatusBatcher):
+    """Run a claimed job and queue its resulting status on `batcher`"""
+    current_time = datetime.datetime.now(datetime.timezone.utc)
+
+    # Calculate wait time for metrics
+    queue_wait_seconds = (
+        current_time - _as_utc(job.created_at)).total_seconds()
+    for_job_type(job_queue_wait_histogram, job.type).observe(
+        queue_wait_seconds)
+
+    logger.info(
+        "Processing job %s (type: %s, priority: %s, waited: %.2fs)",
+        job.id, job.type, job.priority, queue_wait_seconds
+    )
+    if job.scheduled_at:
         logger.info(
-            "Processing job %s (type: %s, priority: %s, waited: %.2fs)",
-            job.id, job.type, job.priority, queue_wait_seconds
-        )
-        if job.scheduled_at:
-            logger.info(
-                "Job was scheduled for %s", job.scheduled_at.isoformat())
-
-        job.status = JobStatus.PROCESSING
-        job.started_at = datetime.datetime.now()
-        db.commit()
-
-        # Start timing the job
-        start_time = time.time()
-    else:
-        logger.info("No jobs ready to process...")
-        return
+            "Job was scheduled for %s", job.scheduled_at.isoformat())
+
+    # Start timing the job
+    start_time = time.time()
 
     try:
         result = execute_job(job)
         duration = time.time() - start_time
+        now = datetime.datetime.now(datetime.timezone.utc)
 
         logger.info("Job %s completed successfully in %.2fs", job.id, duration)
 
         # Success - record metrics
-        job.status = JobStatus.COMPLETED
-        job.result = result
-        job.finished_at = datetime.datetime.now()
+        _finalize(batcher, job, JobStatus.COMPLETED, now, result=result)
 
-        jobs_completed_counter.labels(job_type=job.type).inc()
-        job_duration_histogram.labels(job_type=job.type).observe(duration)
+        for_job_type(jobs_completed_counter, job.type).inc()
+        for_job_type(job_duration_histogram, job.type).observe(duration)
 
     except (JobExecutionError, UnknownJobTypeError) as e:
         duration = time.time() - start_time
-        logger.error("Job %s failed after %.2fs: %s", job.id, duration, str(e))
-
-        job.attempts += 1
-
-        if job.attempts >= job.max_attempts:
-            # No more retries
-            logger.error(
-                "Job %s has failed and has exceeded the max attempts: %s",
-                job.id, job.max_attempts)
-            job.status = JobStatus.FAILED
-            job.error_message = str(e)
-            job.finished_at = datetime.datetime.now()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        logger.error("Job %s failed after %.2fs: %s", job.id, duration, e)
+
+        if _record_failure(batcher, job, e, now):
+            for_job_type(job_duration_histogram, job.type).observe(duration)
+
+
+def _record_failure(
+        batcher: StatusBatcher,
+        job: ClaimedJob,
+        error: BaseException,
+        now: datetime.datetime) -> bool:
+    """
+    Count a failed attempt at a job: queue it for a retry, or mark it
+    FAILED once it is out of attempts. Returns whether it failed for good.
+    """
+    attempts = job.attempts + 1
+
+    if attempts >= job.max_attempts:
+        # No more retries
+        logger.error(
+            "Job %s has failed and has exceeded the max attempts: %s",
+            job.id, job.max_attempts)
+        _finalize(
+            batcher, job, JobStatus.FAILED, now,
+            attempts=attempts,
+            error_message=str(error))
+
+        for_job_type(jobs_failed_counter, job.type).inc()
+        return True
+
+    # Retry
+    logger.info(
+        "Job %s will retry (attempt %s/%s)",
+        job.id, attempts, job.max_attempts)
+    _finalize(
+        batcher, job, JobStatus.PENDING, now,
+        attempts=attempts,
+        error_message=f"Attempt {attempts} failed: {str(error)}")
+
+    for_job_type(jobs_retried_counter, job.type).inc()
+    return False
+
+
+def process_next_batch(
+        db: Session,
+        batch_size: int = WORKER_BATCH_SIZE,
+        executor: Optional[Executor] = None) -> int:
+    """
+    Claim and process a batch of ready jobs. Returns how many there were.
+
+    The claim is committed before any job runs, so the API and the gauges
+    see the batch as PROCESSING; the final statuses of the whole batch are
+    then written in a second commit. If a job raises, the jobs that did
+    finish keep their results, the ones that raised use up an attempt and
+    the rest go back to pending untouched. If the worker process dies
+    mid-batch its jobs stay PROCESSING until supervise() releases them, or
+    until the next startup recovery. With an `executor` the jobs run
+    concurrently on it (they don't touch `db`); otherwise they run one
+    after another.
+    """
+    jobs = claim_batch(db, batch_size)
+    if jobs:
+        # Counted inside the claim's transaction so the batch shows up
+        update_state_gauges(db)
+    db.commit()
+    if not jobs:
+        logger.info("No jobs ready to process...")
+        return 0
 
-            jobs_failed_counter.labels(job_type=job.type).inc()
-            job_duration_histogram.labels(job_type=job.type).observe(duration)
+    batcher = StatusBatcher()
+    # (job, error) for each job that raised something process_job doesn't
+    # handle - a bug in a handler or in the worker itself
+    crashed = []
+    try:
+        if executor is None:
+            for job in jobs:
+                try:
+                    process_job(job, batcher)
+                except Exception as e:
+                    crashed.append((job, e))
+                    raise
         else:
-            # Retry
-            logger.info(
-                "Job %s will retry (attempt %s/%s)",
-                job.id, job.attempts, job.max_attempts)
-            job.status = JobStatus.PENDING
-            job.error_message = f"Attempt {job.attempts} failed: {str(e)}"
-
-            jobs_retried_counter.labels(job_type=job.type).inc()
-
-    finally:
-        job.updated_at = datetime.datetime.now()
-        db.commit()
+            # Let every job finish before looking at errors, so none of
+            # them can still be writing to the batcher afterwards
+            futures = [(executor.submit(process_job, job, batcher), job)
+                       for job in jobs]
+            wait_all([future for future, _ in futures])
+            crashed = [(job, future.exception())
+                       for future, job in futures
+                       if future.exception() is not None]
+            for future, _ in futures:
+                future.result()
+    except BaseException:
+        db.rollback()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        # A job that crashes the worker still uses up an attempt, or it
+        # would be claimed first again on restart and crash it forever
+        for job, error in crashed:
+            logger.error("Job %s crashed the worker: %r", job.id, error)
+            _record_failure(batcher, job, error, now)
+        # Jobs that never got to run go back to the queue untouched
+        for job in jobs:
+            if job.id not in batcher:
+                batcher.put(job.id, status=JobStatus.PENDING,
+                            claimed_by=None, started_at=None,
+                            updated_at=now)
+        batcher.flush(db)
+        raise
+
+    batcher.flush(db)
+    return len(jobs)
+
+
+def process_next_job(db: Session) -> bool:
+    """Fetch and process a pending job from db. Returns whether there was one"""
+    return process_next_batch(db, batch_size=1) > 0
 
 
 def update_state_gauges(db: Session):
     """Update gauge metrics with current job counts"""
-    pending_count = db.query(Job).filter(
-        Job.status == JobStatus.PENDING).count()
-    processing_count = db.query(Job).filter(
-        Job.status == JobStatus.PROCESSING).count()
-
-    jobs_pending_gauge.set(pending_count)
-    jobs_processing_gauge.set(processing_count)
-
-
-def recover_stuck_jobs(db: Session):
-    """On startup, reset PROCESSING jobs to PENDING (crash recovery)"""
-    stuck_jobs = db.query(Job).filter(Job.status == JobStatus.PROCESSING).all()
-    count = len(stuck_jobs)
+    # One grouped count over ix_job_status_id instead of one per status
+    counts = dict(db.execute(
+        select(Job.status, func.count())  # pylint: disable=not-callable
+        .where(Job.status.in_([JobStatus.PENDING, JobStatus.PROCESSING]))
+        .group_by(Job.status)
+    ).all())
+
+    jobs_pending_gauge.set(counts.get(JobStatus.PENDING, 0))
+    jobs_processing_gauge.set(counts.get(JobStatus.PROCESSING, 0))
+
+
+def recover_stuck_jobs(db: Session, claimed_by: Optional[str] = None):
+    """
+    Reset PROCESSING jobs to PENDING (crash recovery). On startup that is
+    every such job; given `claimed_by`, only the jobs of that worker.
+    """
+    query = update(Job).where(Job.status == JobStatus.PROCESSING)
+    if claimed_by is not None:
+        query = query.where(Job.claimed_by == claimed_by)
+
+    count = db.execute(
+        query.values(status=JobStatus.PENDING, claimed_by=None),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+    db.commit()
 
     if count > 0:
         logger.warning("Recovered %s stuck jobs from previous crash", count)
-        db.query(Job).filter(Job.status == JobStatus.PROCESSING).update({
-            "status": JobStatus.PENDING
-        })
-        db.commit()
     else:
         logger.info("No stuck jobs found - clean startup")
 
 
-def worker_loop():
-    """Main worker loop that polls the db for jobs"""
-    db = SESSIONLOCAL()
+def listen_for_new_jobs() -> Optional[Connection]:
+    """
+    Open a connection subscribed to new-job notifications.
 
-    try:
-        # Start metrics server in background thread
-        logger.info(
-            "Starting metrics server on port %s...", WORKER_METRICS_PORT)
-        start_http_server(WORKER_METRICS_PORT)
+    Returns None on databases without LISTEN/NOTIFY, in which case the
+    worker falls back to polling.
+    """
+    if engine.dialect.name != "postgresql":
+        return None
+
+    listener = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    listener.exec_driver_sql(f"LISTEN {JOB_CREATED_CHANNEL}")
+    return listener
+
+
+def wait_for_new_jobs(listener: Optional[Connection], timeout: float):
+    """Block until a new job is announced or `timeout` seconds pass"""
+    if listener is None:
+        time.sleep(timeout)
+        return
 
-        # Wait for database to be ready with retries
-        max_retries = 10
-        retry_count = 0
+    raw_conn = listener.connection.driver_connection
+    readable, _, _ = io_select.select([raw_conn], [], [], timeout)
+    if readable:
+        raw_conn.poll()
+        raw_conn.notifies.clear()
 
+
+def recover_on_startup():
+    """Run crash recovery, retrying until the database is reachable"""
+    db = SESSIONLOCAL()
+    max_retries = 10
+    retry_count = 0
+
+    try:
         while retry_count < max_retries:
             try:
                 # Crash recovery
@@ -229,24 +479,144 @@ def worker_loop():
                         "Failed to connect to database after max retries")
                     raise
                 time.sleep(2)  # Wait 2 seconds before retry
+    finally:
+        db.close()
+
+
+def worker_loop(index: int = 0):
+    """Main worker loop that polls the db for jobs"""
+    db = WORKER_SESSION()
+    executor = ThreadPoolExecutor(
+        max_workers=WORKER_CONCURRENCY, thread_name_prefix="job")
+    listener = None
+
+    try:
+        # Start metrics server in background thread
+        metrics_port = WORKER_METRICS_PORT + index
+        logger.info("Starting metrics server on port %s...", metrics_port)
+        start_http_server(metrics_port)
+
+        listener = listen_for_new_jobs()
 
         # Mark worker as up
         worker_up_gauge.set(1)
 
         # Process loop
         while True:
-            process_next_job(db)
-            update_state_gauges(db)
-            time.sleep(1)  # Poll every second
+            processed = process_next_batch(db, executor=executor)
+
+            if not processed:
+                update_state_gauges(db)
+                # Queue is drained - sleep until a job is created, the
+                # next scheduled job comes due, or the poll interval passes
+                wait_for_new_jobs(
+                    listener,
+                    seconds_until_next_scheduled(db, WORKER_POLL_INTERVAL))
 
     except KeyboardInterrupt:
         logger.info("Worker shutting down gracefully...")
         worker_up_gauge.set(0)
 
+    finally:
+        executor.shutdown(wait=True)
+        if listener is not None:
+            listener.close()
+        WORKER_SESSION.remove()
+
+
+def _init_worker():
+    """Reset state a forked worker process inherits from its parent"""
+    # Never share a connection's socket with another process - drop the
+    # inherited pool (without closing the parent's sockets) and start afresh
+    engine.dispose(close=False)
+    # Forked children would otherwise all replay the parent's sequence
+    _rng.seed(os.getpid())
+
+
+def _run_worker(index: int):
+    """Entry point of a supervised worker process"""
+    _init_worker()
+    worker_loop(index)
+
+
+def _start_process(target: Callable[[int], None], index: int):
+    """Start `target(index)` in a new process"""
+    process = multiprocessing.Process(
+        target=target, args=(index,), name=f"worker-{index}")
+    process.start()
+    logger.info("Started worker process %s (pid %s)", index, process.pid)
+    return process
+
+
+def release_jobs(pid: int):
+    """Put the jobs a dead worker process had claimed back on the queue"""
+    db = SESSIONLOCAL()
+    try:
+        recover_stuck_jobs(db, claimed_by=worker_id(pid))
+    except SQLAlchemyError:
+        # Startup recovery will pick them up instead
+        logger.exception("Could not release jobs of worker pid %s", pid)
     finally:
         db.close()
 
 
+def supervise(
+        count: int,
+        target: Callable[[int], None] = _run_worker,
+        restart_delay: float = WORKER_RESTART_DELAY):
+    """
+    Run `count` worker processes until every one has exited cleanly.
+
+    A process that dies or exits non-zero - an uncaught error, SIGKILL,
+    the OOM killer - is logged, the jobs it had claimed are released, and
+    it is replaced by a new one with the same index, so neither its jobs
+    nor the worker count are silently lost.
+    """
+    processes = {index: _start_process(target, index)
+                 for index in range(count)}
+    try:
+        while processes:
+            wait_any([process.sentinel for process in processes.values()])
+            for index, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+
+                process.join()
+                del processes[index]
+                if process.exitcode == 0:
+                    logger.info("Worker process %s exited", index)
+                    continue
+
+                logger.error(
+                    "Worker process %s (pid %s) died with exit code %s, "
+                    "restarting", index, process.pid, process.exitcode)
+                release_jobs(process.pid)
+                time.sleep(restart_delay)
+                processes[index] = _start_process(target, index)
+
+    except KeyboardInterrupt:
+        # Ctrl-C reaches the children too - let them finish their batch
+        logger.info("Stopping worker processes...")
+        for process in processes.values():
+            process.join()
+
+
+def main():
+    """Recover stuck jobs, then run WORKER_PROCESSES worker loops"""
+    # Recover once, before any worker claims a job - a worker recovering
+    # later would reset jobs its siblings are still running
+    recover_on_startup()
+
+    if WORKER_PROCESSES <= 1:
+        worker_loop()
+        return
+
+    # Children open their own connections
+    engine.dispose()
+    logger.info("Starting %s worker processes...", WORKER_PROCESSES)
+    supervise(WORKER_PROCESSES)
+
+
 if __name__ == "__main__":
     print("🚀 Worker starting...")
-    worker_loop()
+    main()
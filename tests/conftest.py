@@ -2,53 +2,104 @@
 Test configuration and fixtures
 Based on official FastAPI testing documentation
 """
+import itertools
 import os
-from typing import Generator
-from sqlalchemy import create_engine
+from typing import AsyncGenerator, Callable, Generator
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool, StaticPool
 from fastapi.testclient import TestClient
 
-from app.db import Base, get_db
+# Handlers simulate I/O by sleeping - not in tests. Set before app import.
+os.environ["HANDLER_SIMULATED_LATENCY_MS"] = "0"
+
+from app.db import Base, get_db, to_async_url
 from app.main import app
+from app.cache import job_cache
+from app.models import Job
+from app.schemas import JobStatus
 import pytest
 
-# SQLite test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Test database, in-memory SQLite unless TEST_DB_URL says otherwise. A
+# named shared-cache database rather than plain :memory:, so the API's
+# async engine can open the same one; it lives for as long as the sync
+# engine's single StaticPool connection stays open. Each pytest-xdist
+# worker gets its own.
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "TEST_DB_URL",
+    f"sqlite:///file:testdb_{XDIST_WORKER}?mode=memory&cache=shared&uri=true")
+IS_SQLITE = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    poolclass=StaticPool
 )
 
+if IS_SQLITE:
+    # pysqlite's own transaction handling breaks SAVEPOINT - let
+    # SQLAlchemy emit BEGIN itself, per the SQLAlchemy SQLite docs
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, _connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+# Like the app's SESSIONLOCAL, don't expire objects on commit - tests that
+# check persisted state refresh or expire explicitly
 TESTINGSESSIONLOCAL = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine)
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# The API uses async sessions; point them at the same database.
+# NullPool so no connection outlives the TestClient's event loop.
+async_engine = create_async_engine(
+    to_async_url(SQLALCHEMY_DATABASE_URL),
+    poolclass=NullPool
+)
 
+TESTINGASYNCSESSIONLOCAL = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False)
 
-def override_get_db() -> Generator[Session, None, None]:
+
+async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency override for database session
     """
-    try:
-        db = TESTINGSESSIONLOCAL()
+    async with TESTINGASYNCSESSIONLOCAL() as db:
         yield db
-    finally:
-        db.close()
 
 
-@pytest.fixture(autouse=True)
-def setup_test_db():
+@pytest.fixture(scope="session")
+def connection() -> Generator[Connection, None, None]:
+    """
+    One connection for the whole test session, shared by every test
+    """
+    with engine.connect() as conn:
+        yield conn
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_db(connection):
     """
-    Create tables before each test and drop after
+    Create tables once for the whole test session
     """
-    Base.metadata.create_all(bind=engine)
+    with connection.begin():
+        Base.metadata.create_all(bind=connection)
     yield
-    Base.metadata.drop_all(bind=engine)
+    with connection.begin():
+        Base.metadata.drop_all(bind=connection)
 
 
-@pytest.fixture
-def client() -> Generator[TestClient, None, None]:
+@pytest.fixture(scope="session")
+def app_client() -> Generator[TestClient, None, None]:
     """
-    Create a test client with database override
+    Create a test client with database override, shared by all tests
     """
     # Override the database dependency
     app.dependency_overrides[get_db] = override_get_db
@@ -62,28 +113,62 @@ def client() -> Generator[TestClient, None, None]:
 
 
 @pytest.fixture
-def db_session() -> Generator[Session, None, None]:
+def client(app_client, connection) -> Generator[TestClient, None, None]:
     """
-    Create a database session for direct database access in tests
+    The shared test client. API requests commit through their own
+    connections, so there is no test transaction to roll back - empty
+    every table afterwards instead.
+    """
+    yield app_client
+
+    with connection.begin():
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+    # Job ids are reused once tables are emptied, so start with a cold cache
+    job_cache.clear()
+
+
+@pytest.fixture
+def db_session(connection) -> Generator[Session, None, None]:
+    """
+    Create a database session for direct database access in tests.
+
+    The session joins a transaction on the shared connection that is
+    rolled back afterwards. Its own commits only release a SAVEPOINT, and
+    a new one is started after each - so everything a test commits is
+    still undone.
     """
-    connection = engine.connect()
     transaction = connection.begin()
-    session = TESTINGSESSIONLOCAL(bind=connection)
+    session = TESTINGSESSIONLOCAL(
+        bind=connection, join_transaction_mode="create_savepoint")
 
     yield session
 
     session.close()
     transaction.rollback()
-    connection.close()
 
 
-# Cleanup test database file
-def pytest_sessionfinish():
+# Payload for send_email jobs, shared by the test modules
+EMAIL_PAYLOAD = {"to": "test@example.com"}
+
+
+@pytest.fixture
+def job_factory() -> Callable[..., Job]:
     """
-    Cleanup after all tests are done
+    Build unsaved Jobs: a pending send_email job with an empty payload
+    and a unique idempotency key, overridden by any keyword arguments
     """
-    if os.path.exists("./test.db"):
-        try:
-            os.remove("./test.db")
-        except Exception:
-            pass
+    keys = itertools.count()
+
+    def make(**overrides) -> Job:
+        fields = {
+            "idempotency_key": f"job-{next(keys)}",
+            "type": "send_email",
+            "payload": {},
+            "status": JobStatus.PENDING,
+        }
+        fields.update(overrides)
+        return Job(**fields)
+
+    return make
@@ -1,6 +1,7 @@
 """
 API endpoint tests
 """
+from app.cache import job_cache
 from app.schemas import JobStatus
 
 
@@ -119,6 +120,28 @@ def test_get_job(client):
     assert data["status"] == JobStatus.PENDING.value
 
 
+def test_get_job_is_cached(client):
+    """Test that polling a job is served from the job cache"""
+    job_id = client.post("/jobs", json={
+        "type": "send_email",
+        "payload": {"to": "test@example.com"},
+        "idempotency_key": "cache-test",
+        "priority": 5
+    }).json()["job_id"]
+
+    cached = job_cache.get(job_id)
+    assert cached is not None
+    assert cached.job_id == job_id
+
+    # Only the cache says the job is done, so seeing that proves a hit
+    job_cache[job_id] = cached.model_copy(
+        update={"status": JobStatus.COMPLETED})
+
+    response = client.get(f"/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == JobStatus.COMPLETED.value
+
+
 def test_get_nonexistent_job(client):
     """Test getting a job that doesn't exist returns 404"""
     response = client.get("/jobs/99999")
@@ -126,11 +149,46 @@ def test_get_nonexistent_job(client):
     assert "not found" in response.json()["detail"].lower()
 
 
+def test_get_jobs_batch(client):
+    """Test fetching several jobs by id in one request"""
+    job_ids = [
+        client.post("/jobs", json={
+            "type": "send_email",
+            "payload": {"to": f"test{i}@example.com"},
+            "idempotency_key": f"batch-test-{i}",
+            "priority": 5
+        }).json()["job_id"]
+        for i in range(3)
+    ]
+
+    # Force at least one id to come from the database
+    job_cache.pop(job_ids[0], None)
+
+    ids = ",".join(str(job_id) for job_id in job_ids + [99999])
+    response = client.get(f"/jobs/batch?ids={ids}")
+    assert response.status_code == 200
+
+    jobs = response.json()["jobs"]
+    assert set(jobs) == {str(job_id) for job_id in job_ids}
+    assert all(job["status"] == JobStatus.PENDING.value
+               for job in jobs.values())
+
+
+def test_get_jobs_batch_invalid_ids(client):
+    """Test that malformed or too many ids are rejected"""
+    response = client.get("/jobs/batch?ids=1,abc")
+    assert response.status_code == 400
+
+    ids = ",".join(str(i) for i in range(501))
+    response = client.get(f"/jobs/batch?ids={ids}")
+    assert response.status_code == 400
+
+
 def test_list_jobs_empty(client):
     """Test listing jobs when database is empty"""
     response = client.get("/jobs")
     assert response.status_code == 200
-    assert response.json() == {"jobs": []}
+    assert response.json() == {"jobs": [], "next_cursor": None}
 
 
 def test_list_jobs(client):
@@ -154,6 +212,44 @@ def test_list_jobs(client):
                JobStatus.PENDING.value for job in data["jobs"])
 
 
+def test_list_jobs_pagination(client):
+    """Test paging through jobs with limit and after_id"""
+    for i in range(5):
+        client.post("/jobs", json={
+            "type": "send_email",
+            "payload": {"to": f"test{i}@example.com"},
+            "idempotency_key": f"page-test-{i}",
+            "priority": 5
+        })
+
+    # First page
+    response = client.get("/jobs?limit=2")
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["jobs"]) == 2
+    assert first_page["next_cursor"] == first_page["jobs"][-1]["job_id"]
+
+    # Follow the cursor until exhausted
+    seen = [job["job_id"] for job in first_page["jobs"]]
+    cursor = first_page["next_cursor"]
+    while cursor is not None:
+        page = client.get(f"/jobs?limit=2&after_id={cursor}").json()
+        seen.extend(job["job_id"] for job in page["jobs"])
+        cursor = page["next_cursor"]
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+    # A page that ends exactly at the last job has no cursor
+    last_page = client.get(f"/jobs?limit=2&after_id={seen[2]}").json()
+    assert [job["job_id"] for job in last_page["jobs"]] == seen[3:]
+    assert last_page["next_cursor"] is None
+
+    # Limit is capped
+    response = client.get("/jobs?limit=501")
+    assert response.status_code == 422
+
+
 def test_list_jobs_by_status(client):
     """Test filtering jobs by status"""
     # Create a job
@@ -196,6 +292,17 @@ def test_scheduled_job(client):
     assert "2026-12-31" in data["scheduled_at"]
 
 
+def test_scheduled_job_invalid_format(client):
+    """Test that an unparseable scheduled_at is rejected"""
+    response = client.post("/jobs", json={
+        "type": "send_email",
+        "payload": {"to": "test@example.com"},
+        "idempotency_key": "scheduled-invalid-test",
+        "scheduled_at": "next tuesday"
+    })
+    assert response.status_code == 422
+
+
 def test_admin_stats_empty(client):
     """Test admin stats with empty database"""
     response = client.get("/admin/stats")
@@ -2,25 +2,31 @@
 Database model tests
 """
 from datetime import datetime
+from sqlalchemy import delete, insert, text
 from sqlalchemy.exc import IntegrityError
-from app.models import Job
+from app.models import Job, STATUS_CODES
 from app.schemas import JobStatus
+from tests.conftest import EMAIL_PAYLOAD
 import pytest
 
 
-def test_create_job(db_session):
+# Fixed instant to stamp jobs with, so round trips compare exactly
+FINISHED_AT = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def test_create_job(db_session, job_factory):
     """Test creating a job in database"""
-    job = Job(
+    job = job_factory(
         idempotency_key="test-key",
-        type="send_email",
-        payload={"to": "test@example.com"},
-        status=JobStatus.PENDING,
+        payload=EMAIL_PAYLOAD,
         priority=5
     )
 
     db_session.add(job)
     db_session.commit()
 
+    # Reload from the database
+    db_session.refresh(job)
     assert job.id is not None
     assert job.idempotency_key == "test-key"
     assert job.status == JobStatus.PENDING
@@ -28,19 +34,18 @@ def test_create_job(db_session):
     assert job.priority == 5
 
 
-def test_job_defaults(db_session):
+def test_job_defaults(db_session, job_factory):
     """Test that job has correct default values"""
-    job = Job(
+    job = job_factory(
         idempotency_key="test-defaults",
-        type="send_email",
-        payload={"to": "test@example.com"},
-        status=JobStatus.PENDING
+        payload=EMAIL_PAYLOAD
     )
 
     db_session.add(job)
     db_session.commit()
 
-    # Check defaults
+    # Check the defaults that were stored
+    db_session.refresh(job)
     assert job.attempts == 0
     assert job.max_attempts == 3
     assert job.priority == 5
@@ -50,24 +55,14 @@ def test_job_defaults(db_session):
     assert job.error_message is None
 
 
-def test_idempotency_key_unique(db_session):
+def test_idempotency_key_unique(db_session, job_factory):
     """Test that idempotency key must be unique"""
-    job1 = Job(
-        idempotency_key="duplicate",
-        type="send_email",
-        payload={},
-        status=JobStatus.PENDING
-    )
+    job1 = job_factory(idempotency_key="duplicate")
     db_session.add(job1)
     db_session.commit()
 
     # Try to create another job with same idempotency key
-    job2 = Job(
-        idempotency_key="duplicate",
-        type="send_email",
-        payload={},
-        status=JobStatus.PENDING
-    )
+    job2 = job_factory(idempotency_key="duplicate")
     db_session.add(job2)
 
     # Should raise integrity error
@@ -75,41 +70,36 @@ def test_idempotency_key_unique(db_session):
         db_session.commit()
 
 
-def test_job_status_enum(db_session):
-    """Test all job status values"""
-    statuses = [JobStatus.PENDING, JobStatus.PROCESSING,
-                JobStatus.COMPLETED, JobStatus.FAILED]
-
-    for i, status in enumerate(statuses):
-        job = Job(
-            idempotency_key=f"status-test-{i}",
-            type="send_email",
-            payload={},
-            status=status
-        )
-        db_session.add(job)
-
+def test_job_status_stored_as_code(db_session, job_factory):
+    """Test that status is stored as a small integer code"""
+    job = job_factory(
+        idempotency_key="status-code-test",
+        status=JobStatus.COMPLETED
+    )
+    db_session.add(job)
     db_session.commit()
 
-    # Query back and verify
-    jobs = db_session.query(Job).all()
-    assert len(jobs) == 4
-    assert set(job.status for job in jobs) == set(statuses)
+    raw_status = db_session.execute(
+        text("SELECT status FROM job WHERE id = :id"), {"id": job.id}
+    ).scalar_one()
+    assert raw_status == STATUS_CODES[JobStatus.COMPLETED]
+
+    # Filtering by status binds the code too, from a member or its value
+    assert db_session.query(Job).filter(
+        Job.status == JobStatus.COMPLETED).one().id == job.id
+    assert db_session.query(Job).filter(
+        Job.status == "COMPLETED").one().id == job.id
 
 
-def test_job_timestamps(db_session):
+def test_job_timestamps(db_session, job_factory):
     """Test that timestamps are set correctly"""
-    job = Job(
-        idempotency_key="timestamp-test",
-        type="send_email",
-        payload={},
-        status=JobStatus.PENDING
-    )
+    job = job_factory(idempotency_key="timestamp-test")
 
     db_session.add(job)
     db_session.commit()
 
     # Check timestamps exist
+    db_session.refresh(job)
     assert job.created_at is not None
     assert job.updated_at is not None
     assert job.started_at is None
@@ -118,21 +108,22 @@ def test_job_timestamps(db_session):
     # Update the job
     original_created_at = job.created_at
     job.status = JobStatus.COMPLETED
-    job.finished_at = datetime.now()
+    job.finished_at = FINISHED_AT
     db_session.commit()
 
+    # Reload from the database
+    db_session.refresh(job)
     # created_at should not change
     assert job.created_at == original_created_at
     # finished_at should now be set
-    assert job.finished_at is not None
+    assert job.finished_at == FINISHED_AT
 
 
-def test_job_with_result(db_session):
+def test_job_with_result(db_session, job_factory):
     """Test storing result in job"""
-    job = Job(
+    job = job_factory(
         idempotency_key="result-test",
-        type="send_email",
-        payload={"to": "test@example.com"},
+        payload=EMAIL_PAYLOAD,
         status=JobStatus.COMPLETED,
         result={"message": "Email sent successfully", "id": 12345}
     )
@@ -140,20 +131,17 @@ def test_job_with_result(db_session):
     db_session.add(job)
     db_session.commit()
 
-    # Query back
-    retrieved_job = db_session.query(Job).filter_by(
-        idempotency_key="result-test").first()
-    assert retrieved_job.result == {
+    # Reload from the database
+    db_session.expire(job)
+    assert job.result == {
         "message": "Email sent successfully", "id": 12345}
 
 
-def test_job_with_error(db_session):
+def test_job_with_error(db_session, job_factory):
     """Test storing error message in job"""
     error_msg = "Connection timeout after 30 seconds"
-    job = Job(
+    job = job_factory(
         idempotency_key="error-test",
-        type="send_email",
-        payload={},
         status=JobStatus.FAILED,
         error_message=error_msg,
         attempts=3
@@ -162,84 +150,92 @@ def test_job_with_error(db_session):
     db_session.add(job)
     db_session.commit()
 
-    # Query back
-    retrieved_job = db_session.query(Job).filter_by(
-        idempotency_key="error-test").first()
-    assert retrieved_job.error_message == error_msg
-    assert retrieved_job.attempts == 3
+    # Reload from the database
+    db_session.expire(job)
+    assert job.error_message == error_msg
+    assert job.attempts == 3
 
 
-def test_job_scheduled_at(db_session):
+def test_job_scheduled_at(db_session, job_factory):
     """Test scheduled_at field"""
     scheduled_time = datetime(2026, 12, 31, 23, 59, 59)
-    job = Job(
+    job = job_factory(
         idempotency_key="scheduled-test",
-        type="send_email",
-        payload={},
-        status=JobStatus.PENDING,
         scheduled_at=scheduled_time
     )
 
     db_session.add(job)
     db_session.commit()
 
-    # Query back
-    retrieved_job = db_session.query(Job).filter_by(
-        idempotency_key="scheduled-test").first()
-    assert retrieved_job.scheduled_at.year == 2026
-    assert retrieved_job.scheduled_at.month == 12
-    assert retrieved_job.scheduled_at.day == 31
-
-
-def test_query_by_status(db_session):
-    """Test querying jobs by status"""
-    # Create jobs with different statuses
-    statuses = [
-        JobStatus.PENDING,
-        JobStatus.PENDING,
-        JobStatus.PROCESSING,
-        JobStatus.COMPLETED,
-        JobStatus.FAILED
-    ]
-
-    for i, status in enumerate(statuses):
-        job = Job(
-            idempotency_key=f"query-test-{i}",
-            type="send_email",
-            payload={},
-            status=status
-        )
-        db_session.add(job)
-
-    db_session.commit()
-
-    # Query PENDING jobs
-    pending_jobs = db_session.query(Job).filter(
-        Job.status == JobStatus.PENDING).all()
-    assert len(pending_jobs) == 2
-
-    # Query COMPLETED jobs
-    completed_jobs = db_session.query(Job).filter(
-        Job.status == JobStatus.COMPLETED).all()
-    assert len(completed_jobs) == 1
+    # Reload from the database
+    db_session.expire(job)
+    assert job.scheduled_at.year == 2026
+    assert job.scheduled_at.month == 12
+    assert job.scheduled_at.day == 31
 
 
 def test_query_by_priority(db_session):
     """Test querying jobs by priority"""
     # Create jobs with different priorities
-    for priority in [1, 5, 10]:
-        job = Job(
-            idempotency_key=f"priority-{priority}",
-            type="send_email",
-            payload={},
-            status=JobStatus.PENDING,
-            priority=priority
-        )
-        db_session.add(job)
-
+    db_session.bulk_insert_mappings(Job, [
+        {
+            "idempotency_key": f"priority-{priority}",
+            "type": "send_email",
+            "payload": {},
+            "status": JobStatus.PENDING,
+            "priority": priority
+        }
+        for priority in [1, 5, 10]
+    ])
     db_session.commit()
 
     # Query high priority jobs
     high_priority = db_session.query(Job).filter(Job.priority <= 3).all()
     assert len(high_priority) == 1
     assert high_priority[0].priority == 1
+
+
+class TestSeededStatuses:
+    """Read-only status queries, sharing one set of seeded jobs"""
+    STATUSES = [
+        JobStatus.PENDING,
+        JobStatus.PENDING,
+        JobStatus.PROCESSING,
+        JobStatus.COMPLETED,
+        JobStatus.FAILED
+    ]
+
+    @pytest.fixture(scope="class", autouse=True)
+    def seeded_status_jobs(self, connection):
+        """Seed jobs with a fixed status distribution, once per class"""
+        with connection.begin():
+            connection.execute(insert(Job), [
+                {
+                    "idempotency_key": f"query-test-{i}",
+                    "type": "send_email",
+                    "payload": {},
+                    "status": status
+                }
+                for i, status in enumerate(self.STATUSES)
+            ])
+        yield
+        with connection.begin():
+            connection.execute(delete(Job))
+
+    def test_job_status_enum(self, db_session):
+        """Test all job status values"""
+        jobs = db_session.query(Job).all()
+        assert len(jobs) == len(self.STATUSES)
+        assert set(job.status for job in jobs) == set(JobStatus)
+
+    def test_query_by_status(self, db_session):
+        """Test querying jobs by status"""
+        # Query PENDING jobs
+        pending_jobs = db_session.query(Job).filter(
+            Job.status == JobStatus.PENDING).all()
+        assert len(pending_jobs) == 2
+
+        # Query COMPLETED jobs
+        completed_jobs = db_session.query(Job).filter(
+            Job.status == JobStatus.COMPLETED).all()
+        assert len(completed_jobs) == 1
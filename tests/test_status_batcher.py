@@ -0,0 +1,50 @@
+"""
+Status batcher tests
+"""
+from app.schemas import JobStatus
+from app.status_batcher import StatusBatcher
+
+
+def test_put_merges_updates_for_same_job():
+    """Test that repeated puts for one job collapse into one row"""
+    batcher = StatusBatcher()
+    batcher.put(1, status=JobStatus.COMPLETED)
+    batcher.put(1, result={"ok": True})
+    batcher.put(2, status=JobStatus.FAILED)
+
+    assert len(batcher) == 2
+
+
+def test_flush_writes_all_updates(db_session, job_factory):
+    """Test that flush applies every queued update"""
+    jobs = [
+        job_factory(
+            idempotency_key=f"batch-test-{i}",
+            status=JobStatus.PROCESSING
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(jobs)
+    db_session.commit()
+
+    batcher = StatusBatcher()
+    batcher.put(jobs[0].id, status=JobStatus.COMPLETED, result={"ok": True})
+    batcher.put(jobs[1].id, status=JobStatus.FAILED, error_message="boom")
+    batcher.put(jobs[2].id, status=JobStatus.PENDING, attempts=1)
+
+    assert batcher.flush(db_session) == 3
+    assert len(batcher) == 0
+
+    # Bulk UPDATE by primary key doesn't touch loaded objects - reload them
+    for job in jobs:
+        db_session.refresh(job)
+
+    assert jobs[0].status == JobStatus.COMPLETED
+    assert jobs[0].result == {"ok": True}
+    assert jobs[1].status == JobStatus.FAILED
+    assert jobs[1].error_message == "boom"
+    assert jobs[2].status == JobStatus.PENDING
+    assert jobs[2].attempts == 1
+
+    # Nothing queued - nothing written
+    assert batcher.flush(db_session) == 0
@@ -0,0 +1,34 @@
+"""
+Job formatting utility tests
+"""
+from datetime import datetime, timezone
+
+import orjson
+
+from app.models import Job
+from app.schemas import JobStatus
+from app.utils import build_job_response, pack_job
+
+
+def test_pack_job_matches_job_response():
+    """Test that the generated packer encodes jobs like JobResponse"""
+    job = Job(
+        id=7,
+        idempotency_key="pack-test",
+        type="send_email",
+        payload={"to": "test@example.com"},
+        status=JobStatus.COMPLETED,
+        priority=2,
+        attempts=1,
+        result={"status": "sent"},
+        error_message=None,
+        created_at=datetime(2026, 1, 30, 15, 0, 0),
+        updated_at=datetime(2026, 1, 30, 15, 0, 5, tzinfo=timezone.utc),
+        started_at=datetime(2026, 1, 30, 15, 0, 1),
+        finished_at=datetime(2026, 1, 30, 15, 0, 3, 250000),
+        scheduled_at=None
+    )
+
+    packed = orjson.loads(pack_job(job))  # pylint: disable=no-member
+
+    assert packed == build_job_response(job).model_dump(mode="json")
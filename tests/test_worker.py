@@ -1,105 +1,100 @@
 """
 Worker logic tests
 """
+import datetime
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from unittest.mock import patch
-from app.workers import execute_job, handle_send_email, handle_process_data, handle_always_fail
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.db import Base
+from app.workers import (
+    ClaimedJob, claim_batch, execute_job, handle_send_email,
+    handle_process_data, handle_always_fail, process_next_batch,
+    process_next_job,
+    recover_stuck_jobs, seconds_until_next_scheduled, supervise,
+    update_state_gauges
+)
+from app.metrics import jobs_pending_gauge, jobs_processing_gauge
 from app.models import Job
 from app.schemas import JobStatus
+from tests.conftest import EMAIL_PAYLOAD
 import pytest
 
 
-def test_handle_send_email_success():
-    """Test email handler success case"""
-    payload = {"to": "test@example.com"}
+# What the worker hands execute_job. Immutable, so routing tests derive
+# their jobs from it with _replace() instead of building ORM objects.
+CLAIMED_JOB = ClaimedJob(
+    id=1,
+    type="send_email",
+    payload=EMAIL_PAYLOAD,
+    priority=5,
+    attempts=0,
+    max_attempts=3,
+    created_at=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+    scheduled_at=None
+)
 
-    # Mock random to force success (return value > 0.2)
-    with patch('app.workers.random.random', return_value=0.5):
-        with patch('app.workers.time.sleep'):  # Skip the sleep
-            result = handle_send_email(payload)
-            assert result["sent_to"] == "test@example.com"
-            assert result["status"] == "sent"
-
-
-def test_handle_send_email_failure():
-    """Test email handler failure case"""
-    payload = {"to": "test@example.com"}
-
-    # Mock random to force failure (return value < 0.2)
-    with patch('app.workers.random.random', return_value=0.1):
-        with patch('app.workers.time.sleep'):  # Skip the sleep
-            with pytest.raises(Exception, match="Email service temporarily unavailable"):
-                handle_send_email(payload)
-
-
-def test_handle_process_data_success():
-    """Test process data handler success"""
-    payload = {"data": "test data"}
-
-    with patch('app.workers.random.random', return_value=0.5):
-        with patch('app.workers.time.sleep'):
-            result = handle_process_data(payload)
-            assert result["data"] == "test data"
-            assert result["status"] == "processed"
 
+@pytest.fixture(autouse=True, scope="module")
+def _no_sleep():
+    """Skip the handlers' simulated latency in every test"""
+    with patch('app.workers.time.sleep'):
+        yield
 
-def test_handle_process_data_failure():
-    """Test process data handler failure"""
-    payload = {"data": "test data"}
 
-    with patch('app.workers.random.random', return_value=0.1):
-        with patch('app.workers.time.sleep'):
-            with pytest.raises(Exception, match="Process data service temporarily unavailable"):
-                handle_process_data(payload)
+@pytest.fixture
+def force_random(request):
+    """Pin the handlers' random draw - above 0.2 succeeds, below fails"""
+    with patch('app.workers._rng.random', return_value=request.param):
+        yield
 
 
-def test_handle_always_fail():
-    """Test that test_failure job type always fails"""
-    payload = {"test": "data"}
+@pytest.mark.parametrize("handler, payload, force_random, expectation, expected", [
+    (handle_send_email, EMAIL_PAYLOAD, 0.5, nullcontext(),
+     {"sent_to": "test@example.com", "status": "sent"}),
+    (handle_send_email, EMAIL_PAYLOAD, 0.1, pytest.raises(
+        Exception, match="Email service temporarily unavailable"), None),
+    (handle_process_data, {"data": "test data"}, 0.5, nullcontext(),
+     {"data": "test data", "status": "processed"}),
+    (handle_process_data, {"data": "test data"}, 0.1, pytest.raises(
+        Exception, match="Process data service temporarily unavailable"), None),
+    (handle_always_fail, {"test": "data"}, 0.5, pytest.raises(
+        Exception, match="This job is designed to fail"), None),
+], indirect=["force_random"], ids=[
+    "send_email-success", "send_email-failure",
+    "process_data-success", "process_data-failure",
+    "always_fail",
+])
+def test_handlers(handler, payload, force_random, expectation, expected):
+    """Test each handler's success and failure cases"""
+    with expectation:
+        assert handler(payload) == expected
 
-    with patch('app.workers.time.sleep'):
-        with pytest.raises(Exception, match="This job is designed to fail"):
-            handle_always_fail(payload)
 
-
-def test_execute_job_send_email():
+@pytest.mark.parametrize("force_random", [0.5], indirect=True)
+def test_execute_job_send_email(force_random):
     """Test execute_job routes to send_email handler"""
-    job = Job(
-        idempotency_key="test",
-        type="send_email",
-        payload={"to": "test@example.com"},
-        status=JobStatus.PENDING
-    )
+    result = execute_job(CLAIMED_JOB)
+    assert result["sent_to"] == "test@example.com"
+    assert result["status"] == "sent"
 
-    with patch('app.workers.random.random', return_value=0.5):
-        with patch('app.workers.time.sleep'):
-            result = execute_job(job)
-            assert result["sent_to"] == "test@example.com"
-            assert result["status"] == "sent"
 
-
-def test_execute_job_process_data():
+@pytest.mark.parametrize("force_random", [0.5], indirect=True)
+def test_execute_job_process_data(force_random):
     """Test execute_job routes to process_data handler"""
-    job = Job(
-        idempotency_key="test",
-        type="process_data",
-        payload={"data": "test"},
-        status=JobStatus.PENDING
-    )
+    job = CLAIMED_JOB._replace(type="process_data", payload={"data": "test"})
 
-    with patch('app.workers.random.random', return_value=0.5):
-        with patch('app.workers.time.sleep'):
-            result = execute_job(job)
-            assert result["status"] == "processed"
+    result = execute_job(job)
+    assert result["status"] == "processed"
 
 
 def test_execute_job_unknown_type():
     """Test that unknown job type raises ValueError"""
-    job = Job(
-        idempotency_key="test",
-        type="unknown_job_type",
-        payload={},
-        status=JobStatus.PENDING
-    )
+    job = CLAIMED_JOB._replace(type="unknown_job_type")
 
     with pytest.raises(ValueError, match="Unknown job type: unknown_job_type"):
         execute_job(job)
@@ -107,13 +102,287 @@ def test_execute_job_unknown_type():
 
 def test_execute_job_test_failure():
     """Test that test_failure type always raises exception"""
-    job = Job(
-        idempotency_key="test",
-        type="test_failure",
-        payload={},
-        status=JobStatus.PENDING
+    job = CLAIMED_JOB._replace(type="test_failure")
+
+    with pytest.raises(Exception, match="This job is designed to fail"):
+        execute_job(job)
+
+
+def test_update_state_gauges(db_session, job_factory):
+    """Test that gauges reflect pending and processing counts"""
+    statuses = [JobStatus.PENDING, JobStatus.PENDING,
+                JobStatus.PROCESSING, JobStatus.COMPLETED]
+    db_session.add_all([
+        job_factory(idempotency_key=f"gauge-test-{i}", status=status)
+        for i, status in enumerate(statuses)
+    ])
+    db_session.commit()
+
+    update_state_gauges(db_session)
+
+    assert jobs_pending_gauge._value.get() == 2
+    assert jobs_processing_gauge._value.get() == 1
+
+
+@pytest.mark.parametrize("force_random", [0.5], indirect=True)
+def test_process_next_job_completes_job(db_session, force_random, job_factory):
+    """Test that a claimed job is run and marked completed"""
+    job = job_factory(
+        idempotency_key="process-test",
+        payload=EMAIL_PAYLOAD
     )
+    db_session.add(job)
+    db_session.commit()
 
-    with patch('app.workers.time.sleep'):
-        with pytest.raises(Exception, match="This job is designed to fail"):
-            execute_job(job)
+    assert process_next_job(db_session)
+
+    db_session.refresh(job)
+    assert job.status == JobStatus.COMPLETED
+    assert job.result == {"sent_to": "test@example.com", "status": "sent"}
+    assert job.started_at is not None
+    assert job.finished_at is not None
+
+    # Queue is now empty
+    assert not process_next_job(db_session)
+
+
+@pytest.mark.parametrize("force_random", [0.5], indirect=True)
+def test_process_next_job_honors_priority(db_session, force_random, job_factory):
+    """Test that the highest priority job is processed first"""
+    low = job_factory(idempotency_key="priority-low", priority=10)
+    high = job_factory(idempotency_key="priority-high", priority=1)
+    # Oldest first, so only priority can put `high` ahead
+    db_session.add(low)
+    db_session.commit()
+    db_session.add(high)
+    db_session.commit()
+
+    assert process_next_job(db_session)
+
+    db_session.refresh(low)
+    db_session.refresh(high)
+    assert high.status == JobStatus.COMPLETED
+    assert low.status == JobStatus.PENDING
+
+
+@pytest.mark.parametrize("force_random", [0.5], indirect=True)
+def test_process_next_batch_on_executor(db_session, force_random, job_factory):
+    """Test that a whole batch is run concurrently and committed"""
+    jobs = [job_factory(payload=EMAIL_PAYLOAD) for _ in range(3)]
+    db_session.add_all(jobs)
+    db_session.commit()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert process_next_batch(
+            db_session, batch_size=3, executor=executor) == 3
+
+    for job in jobs:
+        db_session.refresh(job)
+        assert job.status == JobStatus.COMPLETED
+        assert job.finished_at is not None
+
+
+@pytest.mark.parametrize("force_random", [0.5], indirect=True)
+def test_process_next_batch_shows_claim_as_processing(
+        db_session, force_random, job_factory):
+    """Test that the claimed batch is counted as processing while it runs"""
+    jobs = [job_factory(payload=EMAIL_PAYLOAD) for _ in range(2)]
+    db_session.add_all(jobs)
+    db_session.commit()
+    seen = []
+
+    def execute_and_look(job):
+        seen.append(jobs_processing_gauge._value.get())
+        return execute_job(job)
+
+    with patch('app.workers.execute_job', side_effect=execute_and_look):
+        process_next_batch(db_session, batch_size=2)
+
+    assert seen == [2, 2]
+
+
+@pytest.mark.parametrize("force_random", [0.5], indirect=True)
+def test_process_next_batch_releases_jobs_on_error(
+        db_session, force_random, job_factory):
+    """Test that an unexpected error keeps finished jobs and frees the rest"""
+    jobs = [job_factory(payload=EMAIL_PAYLOAD) for _ in range(3)]
+    db_session.add_all(jobs)
+    db_session.commit()
+    crashing = jobs[0]
+
+    def execute_or_crash(job):
+        if job.id == crashing.id:
+            raise RuntimeError("worker bug")
+        return execute_job(job)
+
+    with patch('app.workers.execute_job', side_effect=execute_or_crash) as run, \
+            ThreadPoolExecutor(max_workers=3) as executor, \
+            pytest.raises(RuntimeError, match="worker bug"):
+        process_next_batch(db_session, batch_size=3, executor=executor)
+
+    # Every job got to run before the batch was abandoned
+    assert run.call_count == 3
+    db_session.refresh(crashing)
+    assert crashing.status == JobStatus.PENDING
+    assert crashing.attempts == 1
+    assert "worker bug" in crashing.error_message
+    for job in jobs[1:]:
+        db_session.refresh(job)
+        assert job.status == JobStatus.COMPLETED
+
+
+def test_process_next_batch_fails_job_that_keeps_crashing(db_session, job_factory):
+    """Test that a crashing job runs out of attempts and the rest wait"""
+    crashing = job_factory(priority=1, max_attempts=1)
+    waiting = job_factory(priority=2)
+    db_session.add_all([crashing, waiting])
+    db_session.commit()
+
+    with patch('app.workers.execute_job', side_effect=RuntimeError("worker bug")), \
+            pytest.raises(RuntimeError, match="worker bug"):
+        process_next_batch(db_session, batch_size=2)
+
+    db_session.refresh(crashing)
+    db_session.refresh(waiting)
+    assert crashing.status == JobStatus.FAILED
+    assert crashing.attempts == 1
+    # Never ran, so nothing about it changed
+    assert waiting.status == JobStatus.PENDING
+    assert waiting.attempts == 0
+    assert waiting.started_at is None
+    assert waiting.claimed_by is None
+
+
+def test_recover_stuck_jobs(db_session, job_factory):
+    """Test that PROCESSING jobs are reset to PENDING"""
+    stuck = job_factory(idempotency_key="stuck", status=JobStatus.PROCESSING)
+    done = job_factory(idempotency_key="done", status=JobStatus.COMPLETED)
+    db_session.add_all([stuck, done])
+    db_session.commit()
+
+    recover_stuck_jobs(db_session)
+
+    db_session.refresh(stuck)
+    db_session.refresh(done)
+    assert stuck.status == JobStatus.PENDING
+    assert done.status == JobStatus.COMPLETED
+
+
+def test_seconds_until_next_scheduled(db_session, job_factory):
+    """Test the idle wait is cut short by the next scheduled job"""
+    assert seconds_until_next_scheduled(db_session, 60) == 60
+
+    db_session.add(job_factory(
+        idempotency_key="scheduled",
+        scheduled_at=datetime.datetime.now(datetime.timezone.utc)
+        + datetime.timedelta(seconds=30)
+    ))
+    db_session.commit()
+
+    assert 25 < seconds_until_next_scheduled(db_session, 60) <= 30
+    assert seconds_until_next_scheduled(db_session, 5) == 5
+
+
+def crash_once(run_dir, crash, index):
+    """Supervised target that dies on its first run and exits cleanly after"""
+    runs = run_dir / f"worker-{index}"
+    with runs.open("a") as log:
+        log.write("run\n")
+    if len(runs.read_text().splitlines()) == 1:
+        crash()
+
+
+def die_by_sigkill():
+    """Die the way the OOM killer ends a process"""
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def die_by_error():
+    """Die with an uncaught exception"""
+    raise RuntimeError("worker bug")
+
+
+@pytest.mark.parametrize("crash", [die_by_sigkill, die_by_error],
+                         ids=["sigkill", "error"])
+def test_supervise_restarts_dead_workers(tmp_path, crash):
+    """Test that each worker that dies is replaced, and clean exits are not"""
+    with patch('app.workers.release_jobs') as release:
+        supervise(
+            2, target=partial(crash_once, tmp_path, crash), restart_delay=0)
+
+    assert release.call_count == 2
+
+    for index in range(2):
+        runs = (tmp_path / f"worker-{index}").read_text().splitlines()
+        assert len(runs) == 2
+
+
+def claim_then_die(db_url):
+    """Claim a job in a fresh connection, then die holding it"""
+    with sessionmaker(bind=create_engine(db_url))() as db:
+        claim_batch(db, 1)
+        db.commit()
+    die_by_sigkill()
+
+
+def test_supervise_releases_jobs_of_dead_workers(tmp_path, job_factory):
+    """Test that a killed worker's claimed job can be claimed again"""
+    # Worker processes can't see the in-memory test database - share a file
+    db_url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    file_engine = create_engine(db_url)
+    Base.metadata.create_all(file_engine)
+    file_session = sessionmaker(bind=file_engine, expire_on_commit=False)
+    with file_session() as db:
+        job = job_factory()
+        db.add(job)
+        db.commit()
+
+    with patch('app.workers.SESSIONLOCAL', file_session):
+        supervise(1, target=partial(
+            crash_once, tmp_path, partial(claim_then_die, db_url)),
+            restart_delay=0)
+
+    with file_session() as db:
+        released = db.get(Job, job.id)
+        assert released.status == JobStatus.PENDING
+        assert released.claimed_by is None
+        assert [claimed.id for claimed in claim_batch(db, 1)] == [job.id]
+    file_engine.dispose()
+
+
+def query_plans(db_session, run):
+    """SQLite EXPLAIN QUERY PLAN output for each statement `run` executes"""
+    connection = db_session.connection()
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _many):
+        if not statement.startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+    return [
+        " ".join(row[3] for row in connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters))
+        for statement, parameters in statements
+    ]
+
+
+@pytest.mark.parametrize("poll", [
+    lambda db: claim_batch(db, 5),
+    lambda db: seconds_until_next_scheduled(db, 1),
+    update_state_gauges,
+], ids=["claim_batch", "seconds_until_next_scheduled", "update_state_gauges"])
+def test_polling_queries_use_indexes(db_session, poll):
+    """Test that the worker's per-poll queries never scan the whole table"""
+    if db_session.bind.dialect.name != "sqlite":
+        pytest.skip("reads SQLite query plans")
+    plans = query_plans(db_session, lambda: poll(db_session))
+
+    assert plans
+    for plan in plans:
+        assert "USING" in plan and "SCAN job" not in plan, plan